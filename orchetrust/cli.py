@@ -1,18 +1,21 @@
 import typer
 from rich import print as rprint
-from rich.table import Table
 from .version import __version__
 from .log import get_logger
 from .config import Config
 import json
+import os
 from typing import Optional
-from .discovery.filesystem import scan_filesystem
 from pathlib import Path
-import sqlite3
-from .display.tables import print_certificates_table
-from .storage.db import Inventory
-from .notifications.slack import send_slack
-from .util.timebox import iso_to_days_left
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC).decode()
+except ImportError:  # optional speedup for large --json outputs
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2, default=str)
 
 
 app = typer.Typer(add_completion=False, help="OrcheTrust CLI")
@@ -23,6 +26,68 @@ app.add_typer(inventory_app, name="inventory")
 alerts_app = typer.Typer(help="Alerting commands")
 app.add_typer(alerts_app, name="alerts")
 
+def _row_to_display_tuple(r: dict) -> tuple[str, ...]:
+    """Table cells for an Inventory.list() row (every column key is present)."""
+    days = r["days_left"]
+    return (
+        r["source"] or "",
+        r["location"] or "",
+        r["subject"] or "",
+        r["issuer"] or "",
+        r["not_after"] or "",
+        "" if days is None else str(days),
+        ", ".join(r["sans"]),
+    )
+
+def _build_alert_text(rows: list[dict], threshold: int) -> str:
+    """Compose a concise plain-text Slack message for expiring certificates."""
+    if not rows:
+        return f"✅ No certificates expiring within {threshold} day(s)."
+    lines = [f"⚠️ {len(rows)} certificate(s) expiring within {threshold} day(s):"]
+    for r in rows[:20]:  # cap to avoid giant messages
+        loc = r.get("location") or r.get("path") or "(no location)"
+        subj = r.get("subject") or "(no subject)"
+        days = r.get("days_left")
+        exp = r.get("not_after")
+        lines.append(f"• [{days}d] {subj} — {loc} (exp {exp})")
+    if len(rows) > 20:
+        lines.append(f"...and {len(rows)-20} more")
+    return "\n".join(lines)
+
+def _dedupe_scan_paths(paths: list[str]) -> tuple[list[str], list[str], list[str]]:
+    """
+    Split scan roots into (kept, redundant, unresolvable). A root is
+    redundant if it resolves to the same place as, or somewhere inside,
+    another root; unresolvable roots (e.g. symlink loops) couldn't be
+    walked anyway. Kept roots are returned as given (with ~ expanded), in
+    their original order, so reported certificate paths don't change.
+    """
+    resolved: dict[str, str] = {}
+    redundant = []
+    unresolvable = []
+    for p in paths:
+        expanded = os.path.expanduser(p)
+        try:
+            real = str(Path(expanded).resolve())
+        except (OSError, RuntimeError):  # RuntimeError: symlink loop on < 3.13
+            unresolvable.append(p)
+            continue
+        if real in resolved:
+            redundant.append(p)
+        else:
+            resolved[real] = expanded
+    # Sorting by components puts every path right after its ancestors.
+    covered = set()
+    prev = None
+    for real in sorted(resolved, key=lambda r: r.split(os.sep)):
+        if prev is not None and real.startswith(prev.rstrip(os.sep) + os.sep):
+            covered.add(real)
+            redundant.append(resolved[real])
+        else:
+            prev = real
+    kept = [p for real, p in resolved.items() if real not in covered]
+    return kept, redundant, unresolvable
+
 @app.callback()
 def main(ctx: typer.Context):
     """
@@ -34,18 +99,21 @@ def main(ctx: typer.Context):
 
 @inventory_app.command("list")
 def inventory_list(
+    ctx: typer.Context,
     source: Optional[str] = typer.Option(None, "--source", help='Filter by source, e.g. "filesystem"'),
     expiring_within: Optional[int] = typer.Option(None, "--expiring-within", help="Days until expiry threshold"),
     json_out: bool = typer.Option(False, "--json", help="Output JSON instead of table."),
 ):
     """List stored certificates in the inventory."""
-    cfg = Config.load()
+    from .storage.db import Inventory
+
+    cfg: Config = ctx.obj["config"]
     inv = Inventory(cfg.db_path)
     rows = inv.list(source=source, expiring_within_days=expiring_within)
     inv.close()
 
     if json_out:
-        typer.echo(json.dumps(rows, indent=2, default=str))
+        typer.echo(_dumps(rows))
         raise typer.Exit()
 
     from rich.table import Table
@@ -56,21 +124,12 @@ def inventory_list(
         table.add_column(c, overflow="fold")
 
     for r in rows:
-        table.add_row(
-            r.get("source") or "",
-            r.get("location") or "",
-            r.get("subject") or "",
-            r.get("issuer") or "",
-            r.get("not_after") or "",
-            str(r.get("days_left") if r.get("days_left") is not None else ""),
-            ", ".join(r.get("sans") or []),
-            r.get("first_seen") or "",
-            r.get("last_seen") or "",
-        )
+        table.add_row(*_row_to_display_tuple(r), r["first_seen"], r["last_seen"])
     rprint(table)
 
 @inventory_app.command("purge")
 def inventory_purge(
+    ctx: typer.Context,
     source: Optional[str] = typer.Option(None, "--source", help='Purge only a source, e.g. "filesystem"'),
     yes: bool = typer.Option(False, "--yes", help="Do not prompt for confirmation."),
 ):
@@ -80,7 +139,9 @@ def inventory_purge(
             f"This will delete {'ALL entries' if not source else f'entries with source={source}'} from the inventory. Continue?",
             abort=True
         )
-    cfg = Config.load()
+    from .storage.db import Inventory
+
+    cfg: Config = ctx.obj["config"]
     inv = Inventory(cfg.db_path)
     deleted = inv.purge(source=source)
     inv.close()
@@ -88,6 +149,7 @@ def inventory_purge(
 
 @alerts_app.command("run")
 def alerts_run(
+    ctx: typer.Context,
     threshold: int = typer.Option(30, "--threshold", "-t", help="Days until expiry to alert on."),
     source: Optional[str] = typer.Option(None, "--source", help='Filter by source, e.g. "filesystem"'),
     json_out: bool = typer.Option(False, "--json", help="Output JSON payload instead of text."),
@@ -96,18 +158,15 @@ def alerts_run(
     """
     Generate alerts for certificates expiring within the next N days.
     """
+    from .storage.db import Inventory
+
     log = get_logger()
-    cfg = Config.load()
+    cfg: Config = ctx.obj["config"]
 
     inv = Inventory(cfg.db_path)
     rows = inv.list(source=source, expiring_within_days=threshold)
     inv.close()
 
-    # Ensure days_left is present
-    for r in rows:
-        if "days_left" not in r or r["days_left"] is None:
-            r["days_left"] = iso_to_days_left(r.get("not_after"))
-
     # Sort by soonest expiry
     rows.sort(key=lambda r: (r["days_left"] if r["days_left"] is not None else 999999, r.get("not_after") or ""))
 
@@ -117,7 +176,7 @@ def alerts_run(
             "count": len(rows),
             "items": rows,
         }
-        typer.echo(json.dumps(payload, indent=2, default=str))
+        typer.echo(_dumps(payload))
         raise typer.Exit()
 
     # Human-friendly output
@@ -136,42 +195,19 @@ def alerts_run(
             table.add_column(c, overflow="fold")
 
         for r in rows:
-            table.add_row(
-                r.get("source") or "",
-                r.get("location") or "",
-                r.get("subject") or "",
-                r.get("issuer") or "",
-                r.get("not_after") or "",
-                str(r.get("days_left") if r.get("days_left") is not None else ""),
-                ", ".join(r.get("sans") or []),
-            )
+            table.add_row(*_row_to_display_tuple(r))
         rprint(table)
 
     # Optionally send to Slack
     if send:
+        from .notifications.slack import send_slack
+
         webhook = cfg.slack_webhook_url
         if not webhook:
             log.error("Slack webhook not configured. Set ORCHETRUST_SLACK_WEBHOOK_URL or slack_webhook_url in config.")
             raise typer.Exit(code=2)
 
-        if not rows:
-            text = f"✅ No certificates expiring within {threshold} day(s)."
-            ok, detail = send_slack(webhook, text)
-            log.info(f"Slack notify: {detail}" if ok else f"Slack notify failed: {detail}")
-            raise typer.Exit()
-
-        # Compose a concise Slack message (plain text keeps it simple)
-        lines = [f"⚠️ {len(rows)} certificate(s) expiring within {threshold} day(s):"]
-        for r in rows[:20]:  # cap to avoid giant messages
-            loc = r.get("location") or r.get("path") or "(no location)"
-            subj = r.get("subject") or "(no subject)"
-            days = r.get("days_left")
-            exp = r.get("not_after")
-            lines.append(f"• [{days}d] {subj} — {loc} (exp {exp})")
-        if len(rows) > 20:
-            lines.append(f"...and {len(rows)-20} more")
-
-        ok, detail = send_slack(webhook, "\n".join(lines))
+        ok, detail = send_slack(webhook, _build_alert_text(rows, threshold))
         if ok:
             log.info(f"Slack notify: {detail}")
         else:
@@ -188,9 +224,11 @@ def hello(name: str = typer.Argument("world")):
     rprint(f"👋 Hello, {name}!")
 
 @app.command()
-def status():
+def status(ctx: typer.Context):
     """Show basic status/state."""
-    cfg: Config = Config.load()
+    from rich.table import Table
+
+    cfg: Config = ctx.obj["config"]
     table = Table(title="OrcheTrust Status")
     table.add_column("Key")
     table.add_column("Value")
@@ -202,6 +240,7 @@ def status():
 
 @app.command()
 def scan(
+    ctx: typer.Context,
     path: list[str] = typer.Option(
         None,
         "--path",
@@ -210,12 +249,16 @@ def scan(
     ),
     json_out: bool = typer.Option(False, "--json", help="Output JSON instead of a table."),
     write_db: bool = typer.Option(False, "--write-db", help="Persist results to inventory DB."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Re-parse every file instead of reusing the scan cache."),
 ):
     """
     Scan local filesystem for certificates (.pem/.crt/.cer) and show expiry.
     """
+    from .discovery.filesystem import FS_SCAN_CACHE, iter_scan_filesystem, scan_filesystem
+    from .storage.db import Inventory
+
     log = get_logger()
-    cfg = Config.load()
+    cfg: Config = ctx.obj["config"]
     default_paths = cfg.scan_paths or [
         "/etc/ssl", "/etc/nginx", "/usr/local/etc/ssl", str(Path.home() / ".orchetrust" / "certs")
     ]
@@ -226,17 +269,30 @@ def scan(
             extra_paths += [x.strip() for x in p.split(",") if x.strip()]
         paths += extra_paths
 
+    paths, redundant, unresolvable = _dedupe_scan_paths(paths)
+    if unresolvable:
+        log.warning(f"Skipping scan paths that cannot be resolved (e.g. symlink loops): {unresolvable}")
+    if redundant:
+        log.warning(f"Skipping redundant scan paths (already covered): {redundant}")
     log.info(f"Scanning paths: {paths}")
-    rows = scan_filesystem(paths)
-
+    cache_path = None if no_cache else FS_SCAN_CACHE
     if write_db:
+        # Stream rows into the DB while the scan is still parsing, keeping
+        # a copy for the output below.
+        rows = []
+        def _collect():
+            for r in iter_scan_filesystem(paths, cache_path):
+                rows.append(r)
+                yield r
         inv = Inventory(cfg.db_path)
-        count = inv.upsert_many(rows)
+        count = inv.upsert_many(_collect())
         inv.close()
         log.info(f"Wrote {count} records to inventory")
+    else:
+        rows = scan_filesystem(paths, cache_path)
 
     if json_out:
-        typer.echo(json.dumps(rows, indent=2, default=str))
+        typer.echo(_dumps(rows))
         raise typer.Exit()
 
     from rich.table import Table
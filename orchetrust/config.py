@@ -1,13 +1,24 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 import os
-import yaml
 
 DEFAULT_CONFIG_PATHS = [
     Path.cwd() / "orchetrust.yaml",
     Path.home() / ".config" / "orchetrust" / "config.yaml",
 ]
 
+def _read_yaml(p: Path) -> dict:
+    # yaml is imported lazily: it is only needed when a config file exists.
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader
+    # Hand libyaml the raw bytes; it detects the encoding itself.
+    with open(p, "rb") as f:
+        return yaml.load(f, Loader=SafeLoader) or {}
+
 def _default_db_path() -> str:
     base = Path.home() / ".orchetrust"
     base.mkdir(parents=True, exist_ok=True)
@@ -21,13 +32,17 @@ class Config:
 
     @staticmethod
     def load() -> "Config":
-        data = {}
-        for p in DEFAULT_CONFIG_PATHS:
-            if p.exists():
-                with open(p, "r", encoding="utf-8") as f:
-                    data = yaml.safe_load(f) or {}
-                break
-        slack = os.getenv("ORCHETRUST_SLACK_WEBHOOK_URL", data.get("slack_webhook_url"))
-        scan_paths = data.get("scan_paths") or []
-        db_path = os.getenv("ORCHETRUST_DB_PATH", data.get("db_path") or _default_db_path())
-        return Config(slack_webhook_url=slack, scan_paths=scan_paths, db_path=db_path)
\ No newline at end of file
+        # Config sources don't change within a process, so parse them once.
+        return _load_cached()
+
+@lru_cache(maxsize=1)
+def _load_cached() -> Config:
+    data = {}
+    for p in DEFAULT_CONFIG_PATHS:
+        if p.exists():
+            data = _read_yaml(p)
+            break
+    slack = os.getenv("ORCHETRUST_SLACK_WEBHOOK_URL", data.get("slack_webhook_url"))
+    scan_paths = data.get("scan_paths") or []
+    db_path = os.getenv("ORCHETRUST_DB_PATH", data.get("db_path") or _default_db_path())
+    return Config(slack_webhook_url=slack, scan_paths=scan_paths, db_path=db_path)
@@ -1,32 +1,104 @@
-from pathlib import Path
-from typing import Iterable, Dict, Any
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, Iterator, Dict, Any
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from datetime import datetime, timezone
+from pathlib import Path
 
+# All four characters long, so names are matched case-insensitively with
+# name[-4:].lower() in CERT_EXTS.
 CERT_EXTS = {".pem", ".crt", ".cer"}
 
-def _iter_candidate_files(paths: list[str]) -> Iterable[Path]:
+# Below this many files, forking worker processes costs more than it saves.
+PROCESS_POOL_MIN_FILES = 256
+
+# Parsed rows keyed by path and validated by (size, mtime_ns), so re-scans
+# skip reading and parsing files that have not changed.
+FS_SCAN_CACHE = str(Path.home() / ".orchetrust" / "scan_cache.json")
+# Bump whenever the row shape produced by _parse_one changes, so stale
+# cached rows are discarded instead of being served.
+SCAN_CACHE_VERSION = 1
+
+# Returned by _parse_one when the file could not be read (EACCES, EIO, ...).
+# Unlike "not a certificate" (None) it is never cached: fixing permissions
+# doesn't change mtime, so the file must be retried on the next scan.
+# A plain string so it survives the trip back from a worker process.
+_UNREADABLE = "unreadable"
+
+def _iter_candidate_files(paths: list[str]) -> Iterable[tuple[str, int, int]]:
+    """
+    Yield (path, size, mtime_ns) for every candidate cert file under `paths`.
+    """
+    # Explicit scandir walk: filter on the entry name before any stat and
+    # avoid building a Path object per entry. Like rglob, symlinked dirs are
+    # not descended into, but symlinked cert files are still picked up.
+    stack = []
     for base in paths:
-        p = Path(base).expanduser()
-        if p.is_file() and p.suffix.lower() in CERT_EXTS:
-            yield p
-        elif p.is_dir():
-            for f in p.rglob("*"):
-                if f.is_file() and f.suffix.lower() in CERT_EXTS:
-                    yield f
-
-def _load_cert(path: Path) -> x509.Certificate | None:
-    try:
-        data = path.read_bytes()
+        p = os.path.expanduser(base)
+        if os.path.isfile(p):
+            if p[-4:].lower() in CERT_EXTS:
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                yield p, st.st_size, st.st_mtime_ns
+        elif os.path.isdir(p):
+            stack.append(p)
+    while stack:
+        base = stack.pop()
         try:
-            return x509.load_pem_x509_certificate(data)
-        except Exception:
+            it = os.scandir(base)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.name[-4:].lower() in CERT_EXTS and e.is_file():
+                        st = e.stat()
+                        yield e.path, st.st_size, st.st_mtime_ns
+                except OSError:
+                    continue
+
+def _read_bytes(path: str) -> bytes:
+    # open + fstat + one read sized to the file, rather than the buffered
+    # reader's extra seek/read-to-EOF round trips.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size + 1)
+        if len(data) > size:  # file grew since fstat; read the rest
+            chunks = [data]
+            while chunk := os.read(fd, 65536):
+                chunks.append(chunk)
+            data = b"".join(chunks)
+        return data
+    finally:
+        os.close(fd)
+
+def _load_cert_from_bytes(data: bytes) -> x509.Certificate | None:
+    # Pick the decoder from the content instead of trying PEM and falling
+    # back to DER on failure. DER certificates always start with a SEQUENCE
+    # tag (0x30), but so does a text preamble beginning with ASCII "0", so
+    # also require the absence of a PEM marker. Everything else goes to the
+    # PEM loader, which copes with preambles such as `openssl x509 -text`.
+    try:
+        if data[:1] == b"\x30" and b"-----BEGIN" not in data:
             return x509.load_der_x509_certificate(data)
+        return x509.load_pem_x509_certificate(data)
     except Exception:
         return None
 
+def _load_cert(path: str) -> x509.Certificate | None:
+    # Read errors propagate as OSError so callers can tell them apart from
+    # files that are not certificates.
+    return _load_cert_from_bytes(_read_bytes(path))
+
 def _days_left(dt: datetime) -> int:
     now = datetime.now(timezone.utc)
     return int((dt - now).total_seconds() // 86400)
@@ -34,32 +106,119 @@ def _days_left(dt: datetime) -> int:
 def _fingerprint_sha256(cert: x509.Certificate) -> str:
     return cert.fingerprint(hashes.SHA256()).hex()
 
-def scan_filesystem(paths: list[str]) -> list[Dict[str, Any]]:
-    results = []
-    for f in _iter_candidate_files(paths):
-        cert = _load_cert(f)
-        if not cert:
-            continue
-        subject = cert.subject.rfc4514_string()
-        issuer = cert.issuer.rfc4514_string()
-        # Use *_utc to avoid deprecation warnings
-        not_before = cert.not_valid_before_utc
-        not_after = cert.not_valid_after_utc
-        days = _days_left(not_after)
+def _parse_one(path_str: str) -> Dict[str, Any] | str | None:
+    """
+    Load and describe a single certificate file.
+    Runs in a worker, so it only returns plain (picklable) values:
+    a row, None for a non-certificate, or _UNREADABLE.
+    """
+    try:
+        cert = _load_cert(path_str)
+    except OSError:
+        return _UNREADABLE
+    if not cert:
+        return None
+    subject = cert.subject.rfc4514_string()
+    issuer = cert.issuer.rfc4514_string()
+    # Use *_utc to avoid deprecation warnings
+    not_before = cert.not_valid_before_utc
+    not_after = cert.not_valid_after_utc
+    try:
+        ext = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+        # Already a list[str] for DNSName
+        sans = ext.value.get_values_for_type(x509.DNSName)
+    except Exception:
+        sans = []
+    return {
+        "fingerprint": _fingerprint_sha256(cert),
+        "source": "filesystem",
+        "path": path_str,
+        "subject": subject,
+        "sans": sans,
+        "issuer": issuer,
+        "not_before": not_before.astimezone(timezone.utc).isoformat(),
+        "not_after": not_after.astimezone(timezone.utc).isoformat(),
+    }
+
+def _load_scan_cache(cache_path: str) -> dict[str, list]:
+    try:
+        with open(cache_path, "rb") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != SCAN_CACHE_VERSION:
+        return {}
+    entries = cache.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+def _save_scan_cache(cache_path: str, cache: dict[str, list]) -> None:
+    # A unique temp file per writer, so concurrent scans never write into
+    # the same file; whichever os.replace lands last wins intact.
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".scan_cache.", suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": SCAN_CACHE_VERSION, "entries": cache}, f)
+        os.replace(tmp, cache_path)
+    except OSError:
         try:
-            ext = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName)
-            sans = [str(x) for x in ext.value.get_values_for_type(x509.DNSName)]
-        except Exception:
-            sans = []
-        results.append({
-            "fingerprint": _fingerprint_sha256(cert),
-            "source": "filesystem",
-            "path": str(f),
-            "subject": subject,
-            "sans": sans,
-            "issuer": issuer,
-            "not_before": not_before.isoformat(),
-            "not_after": not_after.isoformat(),
-            "days_left": days,
-        })
-    return results
\ No newline at end of file
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+def _with_days_left(row: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(row, days_left=_days_left(datetime.fromisoformat(row["not_after"])))
+
+def iter_scan_filesystem(
+    paths: list[str],
+    cache_path: str | None = FS_SCAN_CACHE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield certificate rows as the worker pool parses them, so callers can
+    persist results while the rest of the scan is still running.
+
+    Files whose size and mtime match the scan cache at `cache_path` are not
+    re-read. Pass cache_path=None to parse everything.
+    """
+    cache = _load_scan_cache(cache_path) if cache_path else {}
+    # path -> [size, mtime_ns, row or None]; None marks a non-certificate
+    seen: dict[str, list] = {}
+    misses = []
+    for path, size, mtime_ns in _iter_candidate_files(paths):
+        hit = cache.get(path)
+        if hit and hit[0] == size and hit[1] == mtime_ns:
+            seen[path] = hit
+            if hit[2] is not None:
+                yield _with_days_left(hit[2])
+        else:
+            misses.append((path, size, mtime_ns))
+
+    if misses:
+        workers = os.cpu_count() or 1
+        if len(misses) < PROCESS_POOL_MIN_FILES:
+            pool = ThreadPoolExecutor(max_workers=workers)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        with pool as executor:
+            parsed = executor.map(_parse_one, [m[0] for m in misses], chunksize=64)
+            for (path, size, mtime_ns), row in zip(misses, parsed):
+                if row == _UNREADABLE:
+                    continue
+                seen[path] = [size, mtime_ns, row]
+                if row is not None:
+                    yield _with_days_left(row)
+
+    if cache_path:
+        # Keep entries for paths outside this scan unless the file is gone.
+        for path, entry in cache.items():
+            if path not in seen and os.path.exists(path):
+                seen[path] = entry
+        if seen != cache:
+            _save_scan_cache(cache_path, seen)
+
+def scan_filesystem(paths: list[str], cache_path: str | None = FS_SCAN_CACHE) -> list[Dict[str, Any]]:
+    return list(iter_scan_filesystem(paths, cache_path))
@@ -1,7 +1,102 @@
 from __future__ import annotations
+import base64
+import http.client
 import json
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
+from urllib.parse import unquote, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+# One connection (plus its per-connection proxy headers) per
+# (scheme, host, proxy), kept alive across calls so repeated notifications
+# from the same process skip the TCP + TLS handshake. Only host-level state
+# lives here: the request target differs per webhook and is built per call.
+_CONNECTIONS: dict[tuple[str, str, str | None], tuple[http.client.HTTPConnection, dict[str, str]]] = {}
+
+def _proxy_for(scheme: str, host: str) -> str | None:
+    """Proxy URL for `scheme` from *_proxy env vars (honoring no_proxy), as urlopen did."""
+    proxy = getproxies().get(scheme)
+    if not proxy or proxy_bypass(host):
+        return None
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+def _proxy_auth_header(proxy) -> dict[str, str]:
+    if proxy.username is None:
+        return {}
+    creds = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(creds.encode()).decode()}
+
+def _request_target(parts, proxy_url: str | None) -> str:
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    if proxy_url and parts.scheme == "http":
+        # Plain HTTP goes to the proxy with an absolute-URI request target.
+        return f"http://{parts.netloc}{target}"
+    return target
+
+def _connect(parts, proxy_url: str | None, timeout: int) -> tuple[http.client.HTTPConnection, dict[str, str]]:
+    """Return (connection, extra request headers) for a fresh connection."""
+    if not proxy_url:
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        return cls(parts.netloc, timeout=timeout), {}
+
+    proxy = urlsplit(proxy_url)
+    auth = _proxy_auth_header(proxy)
+    if parts.scheme == "https":
+        # CONNECT through the proxy, then TLS to the webhook host.
+        conn = http.client.HTTPSConnection(proxy.hostname, proxy.port or 80, timeout=timeout)
+        conn.set_tunnel(parts.hostname, parts.port or 443, headers=auth)
+        return conn, {}
+    conn = http.client.HTTPConnection(proxy.hostname, proxy.port or 80, timeout=timeout)
+    return conn, auth
+
+def _post(webhook_url: str, body: bytes, timeout: int) -> tuple[int, bytes]:
+    parts = urlsplit(webhook_url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"unsupported URL scheme: {parts.scheme!r}")
+    proxy_url = _proxy_for(parts.scheme, parts.hostname or "")
+    key = (parts.scheme, parts.netloc, proxy_url)
+    target = _request_target(parts, proxy_url)
+
+    while True:
+        entry = _CONNECTIONS.get(key)
+        if entry is None:
+            entry = _CONNECTIONS[key] = _connect(parts, proxy_url, timeout)
+        conn, extra_headers = entry
+        # Only a connection with an open socket from an earlier call can
+        # have gone stale while idle.
+        reused = conn.sock is not None
+        conn.timeout = timeout
+        if reused:
+            conn.sock.settimeout(timeout)
+        headers = {"Content-Type": "application/json; charset=utf-8", **extra_headers}
+        try:
+            try:
+                conn.request("POST", target, body=body, headers=headers)
+            except (BrokenPipeError, ConnectionResetError):
+                # The server closed the idle socket before we could send.
+                if reused:
+                    _drop(key, conn)
+                    continue
+                raise
+            try:
+                resp = conn.getresponse()
+            except http.client.RemoteDisconnected:
+                # Closed without a single byte of status line: the request
+                # was not processed, so it is safe to send it again.
+                if reused:
+                    _drop(key, conn)
+                    continue
+                raise
+            return resp.status, resp.read()
+        except (http.client.HTTPException, OSError):
+            # Anything else (notably timeouts) may mean Slack already got
+            # the message; never resend, just discard the connection.
+            _drop(key, conn)
+            raise
+
+def _drop(key: tuple[str, str, str | None], conn: http.client.HTTPConnection) -> None:
+    conn.close()
+    _CONNECTIONS.pop(key, None)
 
 def send_slack(webhook_url: str, text: str, blocks: list[dict] | None = None, timeout: int = 10) -> tuple[bool, str]:
     """
@@ -12,19 +107,23 @@ def send_slack(webhook_url: str, text: str, blocks: list[dict] | None = None, ti
     if blocks:
         payload["blocks"] = blocks
     data = json.dumps(payload).encode("utf-8")
-    req = Request(
-        webhook_url,
-        data=data,
-        headers={"Content-Type": "application/json; charset=utf-8"},
-        method="POST",
-    )
     try:
-        with urlopen(req, timeout=timeout) as resp:
-            # Slack returns "ok" (200) on success; body may be empty
-            return True, f"HTTP {resp.status}"
-    except HTTPError as e:
-        return False, f"HTTPError {e.code}: {e.read().decode('utf-8', 'ignore')}"
-    except URLError as e:
-        return False, f"URLError: {e.reason}"
+        status, body = _post(webhook_url, data, timeout)
+    except (http.client.HTTPException, OSError) as e:
+        return False, f"URLError: {e}"
     except Exception as e:
-        return False, f"Error: {e}"
\ No newline at end of file
+        return False, f"Error: {e}"
+    if status >= 400:
+        return False, f"HTTPError {status}: {body.decode('utf-8', 'ignore')}"
+    # Slack returns "ok" (200) on success; body may be empty
+    return True, f"HTTP {status}"
+
+def send_slack_batched(webhook_url: str, messages: list[str], timeout: int = 10) -> tuple[bool, str]:
+    """
+    Post several messages as a single Slack message, separated by "---".
+    One request per batch keeps loops that alert repeatedly well under
+    Slack's ~1 message/second webhook rate limit.
+    """
+    if not messages:
+        return True, "nothing to send"
+    return send_slack(webhook_url, "\n---\n".join(messages), timeout=timeout)
@@ -1,12 +1,22 @@
 from __future__ import annotations
 from datetime import datetime, timezone
+from functools import lru_cache
 
-def iso_to_days_left(iso_dt: str | None) -> int | None:
+@lru_cache(maxsize=4096)
+def _parse_iso(s: str) -> datetime:
+    return datetime.fromisoformat(s)
+
+def iso_to_days_left(iso_dt: str | None, now: datetime | None = None) -> int | None:
+    """
+    Whole days from `now` (default: current UTC time) until `iso_dt`.
+    Pass `now` when converting many values so they share one reference time.
+    """
     if not iso_dt:
         return None
     try:
-        exp = datetime.fromisoformat(iso_dt)
-        now = datetime.now(timezone.utc)
+        exp = _parse_iso(iso_dt)
+        if now is None:
+            now = datetime.now(timezone.utc)
         return int((exp - now).total_seconds() // 86400)
     except Exception:
-        return None
\ No newline at end of file
+        return None
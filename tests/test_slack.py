@@ -0,0 +1,49 @@
+import http.server
+import json
+import threading
+
+import pytest
+
+from orchetrust.notifications import slack
+
+
+class _RecordingHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connections get reused
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append((self.path, json.loads(body)["text"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    for var in ("http_proxy", "HTTP_PROXY", "https_proxy", "HTTPS_PROXY", "no_proxy", "NO_PROXY"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(slack, "_CONNECTIONS", {})
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    srv.received = []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_send_slack_posts_each_webhook_to_its_own_path(server):
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    assert slack.send_slack(f"{base}/services/T1/B1/teamA", "for A") == (True, "HTTP 200")
+    assert slack.send_slack(f"{base}/services/T2/B2/teamB", "for B") == (True, "HTTP 200")
+
+    assert server.received == [
+        ("/services/T1/B1/teamA", "for A"),
+        ("/services/T2/B2/teamB", "for B"),
+    ]
+    # Both calls shared one kept-alive connection.
+    assert len(slack._CONNECTIONS) == 1